@@ -5,160 +5,435 @@ This script bridges the Node.js backend with the Python LangExtract library.
 """
 
 import sys
+import io
 import json
 import os
 import tempfile
+import mmap
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import importlib
+from functools import partial
 from typing import List, Dict, Any, Optional
 import traceback
+import argparse
+import contextlib
+import threading
 
 # File processing imports
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 import mimetypes
 
-# Document processing imports
+# LangExtract reads the API key at extract() time, so it can be imported up front;
+# failures are reported from main() rather than at import
 try:
-    import docx
-    from docx import Document
-except ImportError:
-    docx = None
+    import langextract as lx
+    _LX_IMPORT_ERR = None
+except Exception as e:
+    lx = None
+    _LX_IMPORT_ERR = e
 
+# orjson serializes large extraction payloads far faster than the stdlib
 try:
-    import pdfplumber
-    import PyPDF2
+    import orjson
 except ImportError:
-    pdfplumber = None
-    PyPDF2 = None
+    orjson = None
 
-try:
-    import openpyxl
-    from openpyxl import load_workbook
-except ImportError:
-    openpyxl = None
+# Document libraries are imported on first use, so a run only pays the import
+# cost of the formats it actually handles. name -> module, or None if missing.
+_MODULES: Dict[str, Any] = {}
 
-try:
-    from pptx import Presentation
-except ImportError:
-    Presentation = None
+def _lazy(name: str):
+    """Import a module on first use and memoize it; None if not installed."""
+    if name not in _MODULES:
+        try:
+            _MODULES[name] = importlib.import_module(name)
+        except ImportError:
+            _MODULES[name] = None
+    return _MODULES[name]
+
+def _get_fitz():
+    """PyMuPDF, preferring its current module name over the legacy fitz alias."""
+    return _lazy('pymupdf') or _lazy('fitz')
+
+# Plain-text uploads above this size are rejected rather than read into memory
+MAX_TEXT_BYTES = int(os.environ.get('LX_MAX_TEXT_BYTES', 50_000_000))
+
+# Plain-text files above this size are read through mmap
+MMAP_TEXT_THRESHOLD = 1 << 20
+
+# Downloaded bodies are buffered in memory up to this size
+MAX_DOWNLOAD_BYTES = int(os.environ.get('LX_MAX_DOWNLOAD_BYTES', 100_000_000))
+
+# Read size used when streaming downloads
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# Shared HTTP session so repeated downloads reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        # A large Retry-After would otherwise block far past the 30s timeout
+        respect_retry_after_header=False
+    )
+)
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+
+# Number of extracted URLs kept in memory for repeat requests
+URL_CACHE_SIZE = int(os.environ.get('LX_URL_CACHE_SIZE', 128))
+
+# url -> (expires_at, text), populated only when Cache-Control allows reuse
+_URL_CACHE: Dict[str, tuple] = {}
+
+# API key from the launching environment; requests may override it per call,
+# so it is captured before any request writes to os.environ
+_ENV_API_KEY = os.environ.get('GEMINI_API_KEY')
+
+# Shared default for examples without attributes; langextract only reads it
+_EMPTY_ATTRIBUTES: Dict[str, Any] = {}
+
+# PyMuPDF is used for plain text unless pdfplumber is requested explicitly
+PDF_ENGINE = os.environ.get('LX_PDF_ENGINE', 'pymupdf').lower()
+
+# Set in --serve pool workers, which must not start nested process pools
+_IN_SERVE_WORKER = False
+
+# PDFs shorter than this are extracted in-process; process startup would dominate
+PARALLEL_PDF_MIN_PAGES = 8
+
+def _dumpb(obj: Any) -> bytes:
+    """Serialize an object to UTF-8 JSON bytes."""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+def _dumps(obj: Any) -> str:
+    """Serialize an object to a JSON string."""
+    if orjson:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+def _loads(data):
+    """Parse JSON from str or bytes."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _get_max_workers() -> int:
+    """Number of worker processes for parallel extraction."""
+    env_workers = os.environ.get('LX_MAX_WORKERS')
+    if env_workers:
+        return max(1, int(env_workers))
+    return os.cpu_count() or 1
+
+def _extract_pdf_pages(file_path: str, page_numbers: List[int]) -> List[str]:
+    """Extract the text of a block of (one-indexed) PDF pages from one open."""
+    pdfplumber = _lazy('pdfplumber')
+    with pdfplumber.open(file_path, pages=page_numbers) as pdf:
+        return [page.extract_text() for page in pdf.pages]
+
+def _read_text(file_path: str) -> str:
+    """Read a plain-text file, refusing files larger than MAX_TEXT_BYTES."""
+    size = os.path.getsize(file_path)
+    if size > MAX_TEXT_BYTES:
+        raise ValueError(f"File is {size} bytes, larger than the {MAX_TEXT_BYTES} byte text limit")
+    
+    if size <= MMAP_TEXT_THRESHOLD:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    
+    # Let the kernel page large files in lazily and decode straight from the map
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = str(mm, 'utf-8', 'ignore')
+    if '\r' in text:
+        # Match the newline translation of text-mode reads
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
 
-from bs4 import BeautifulSoup
+def _html_to_text(markup: bytes) -> str:
+    """Parse raw HTML bytes, letting the parser sniff the encoding itself."""
+    # Prefer the C-based lxml parser. bs4 picks up cchardet for encoding
+    # detection on its own when it is installed; nothing to import here.
+    BeautifulSoup = _lazy('bs4').BeautifulSoup
+    soup = BeautifulSoup(markup, 'lxml' if _lazy('lxml') else 'html.parser')
+    return soup.get_text(separator='\n', strip=True)
+
+def _extract_pdf_pdfplumber(file_path: str) -> str:
+    """Extract PDF text with pdfplumber (layout-aware, slower)."""
+    pdfplumber = _lazy('pdfplumber')
+    workers = _get_max_workers()
+    with pdfplumber.open(file_path) as pdf:
+        n_pages = len(pdf.pages)
+        # --serve workers already run one per core; don't nest another pool
+        parallel = (workers > 1 and n_pages >= PARALLEL_PDF_MIN_PAGES
+                    and not _IN_SERVE_WORKER)
+        if not parallel:
+            texts = [page.extract_text() for page in pdf.pages]
+    
+    if parallel:
+        # Each task parses the file once for a contiguous block of pages;
+        # opening it per page costs more than the extraction itself
+        workers = min(workers, n_pages)
+        step = -(-n_pages // workers)
+        blocks = [list(range(start, min(start + step, n_pages + 1)))
+                  for start in range(1, n_pages + 1, step)]
+        with ProcessPoolExecutor(max_workers=len(blocks)) as ex:
+            texts = [text
+                     for block in ex.map(partial(_extract_pdf_pages, file_path), blocks)
+                     for text in block]
+    return '\n'.join(t for t in texts if t).strip()
+
+def _extract_pdf_fitz(file_path: str) -> str:
+    """Extract PDF text with PyMuPDF (text-only fast path)."""
+    with _get_fitz().open(file_path) as doc:
+        return _fitz_doc_text(doc)
+
+def _fitz_doc_text(doc) -> str:
+    """Join the text of an open PyMuPDF document, one line break between pages."""
+    texts = [doc[i].get_text("text").rstrip('\n') for i in range(doc.page_count)]
+    return '\n'.join(t for t in texts if t).strip()
+
+def _use_fitz() -> bool:
+    """Whether PDFs are read with PyMuPDF rather than pdfplumber."""
+    if PDF_ENGINE == 'pdfplumber' and _lazy('pdfplumber'):
+        return False
+    return _get_fitz() is not None
+
+def _extract_pdf_stream(stream: io.BytesIO) -> str:
+    """Extract text from an in-memory PDF."""
+    if _use_fitz():
+        with _get_fitz().open(stream=stream, filetype='pdf') as doc:
+            return _fitz_doc_text(doc)
+    with _lazy('pdfplumber').open(stream) as pdf:
+        texts = [page.extract_text() for page in pdf.pages]
+    return '\n'.join(t for t in texts if t).strip()
+
+def _slide_text(numbered_slide) -> str:
+    """Collect the text of one (slide_num, slide) pair."""
+    slide_num, slide = numbered_slide
+    buf = io.StringIO()
+    buf.write(f"Slide {slide_num}:")
+    for shape in slide.shapes:
+        if hasattr(shape, "text"):
+            buf.write('\n')
+            buf.write(shape.text)
+    return buf.getvalue()
+
+def _extract_text(file_path: str) -> str:
+    """Plain-text files and the fallback for unknown types."""
+    return _read_text(file_path)
+
+def _extract_html(file_path: str) -> str:
+    """HTML files."""
+    with open(file_path, 'rb') as f:
+        return _html_to_text(f.read())
+
+def _extract_pdf(file_path: str) -> str:
+    """PDF files."""
+    if _use_fitz():
+        return _extract_pdf_fitz(file_path)
+    if _lazy('pdfplumber'):
+        return _extract_pdf_pdfplumber(file_path)
+    raise ValueError("PyMuPDF or pdfplumber is required for PDF files")
+
+def _extract_docx(file_path: str) -> str:
+    """Word documents."""
+    docx = _lazy('docx')
+    if not docx:
+        raise ValueError("python-docx is required for Word documents")
+    doc = docx.Document(file_path)
+    # Write into one growing buffer rather than a list plus a final join
+    buf = io.StringIO()
+    for i, paragraph in enumerate(doc.paragraphs):
+        if i:
+            buf.write('\n')
+        buf.write(paragraph.text)
+    return buf.getvalue()
+
+def _extract_xlsx(file_path: str) -> str:
+    """Excel workbooks."""
+    openpyxl = _lazy('openpyxl')
+    if not openpyxl:
+        raise ValueError("openpyxl is required for Excel files")
+    # Read-only mode streams rows instead of building the full cell grid
+    workbook = openpyxl.load_workbook(file_path, data_only=True, read_only=True, keep_links=False)
+    try:
+        # Row parsing is pure Python, so sheets are read serially from one handle
+        return '\n'.join(_worksheet_text(workbook, name) for name in workbook.sheetnames)
+    finally:
+        workbook.close()
+
+def _worksheet_text(workbook, sheet_name: str) -> str:
+    """Collect the text of one worksheet of an open workbook."""
+    sheet = workbook[sheet_name]
+    buf = io.StringIO()
+    buf.write(f"Sheet: {sheet_name}")
+    for row in sheet.iter_rows(values_only=True):
+        if any(cell is not None and cell != '' for cell in row):
+            buf.write('\n')
+            buf.write('\t'.join('' if cell is None else str(cell) for cell in row))
+    return buf.getvalue()
+
+def _extract_pptx(file_path: str) -> str:
+    """PowerPoint presentations."""
+    pptx = _lazy('pptx')
+    if not pptx:
+        raise ValueError("python-pptx is required for PowerPoint files")
+    prs = pptx.Presentation(file_path)
+    # Shape access holds the GIL, so slides are read serially
+    return '\n'.join(map(_slide_text, enumerate(prs.slides, 1)))
+
+def _extract_json(file_path: str) -> str:
+    """JSON files, re-serialized with indentation."""
+    # stdlib json on purpose: it keeps big integers exact and accepts NaN/Infinity
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+        return json.dumps(data, indent=2)
+
+# File extension -> extractor, resolved with a single dict lookup per file
+_HANDLERS = {
+    '.pdf': _extract_pdf,
+    '.docx': _extract_docx,
+    '.doc': _extract_docx,
+    '.xlsx': _extract_xlsx,
+    '.xls': _extract_xlsx,
+    '.pptx': _extract_pptx,
+    '.ppt': _extract_pptx,
+    '.html': _extract_html,
+    '.htm': _extract_html,
+    '.json': _extract_json,
+}
+_TEXT_EXTS = frozenset({'.txt', '.md', '.csv'})
+_HANDLERS.update(dict.fromkeys(_TEXT_EXTS, _extract_text))
+
+def _split_mime(mime_type: Optional[str]) -> tuple:
+    """Normalize a mime/content type into its (top, subtype) parts."""
+    mime = (mime_type or '').split(';', 1)[0].strip().lower()
+    top, _, sub = mime.partition('/')
+    return top, sub
 
 def extract_text_from_file(file_path: str, mime_type: str = None) -> str:
     """Extract text from various file formats."""
-    if not mime_type:
-        mime_type, _ = mimetypes.guess_type(file_path)
-    
     file_ext = Path(file_path).suffix.lower()
     
+    handler = _HANDLERS.get(file_ext)
+    if handler is None:
+        # Unknown extension: fall back on the mime type
+        if not mime_type:
+            mime_type, _ = mimetypes.guess_type(file_path)
+        _, sub = _split_mime(mime_type)
+        handler = _extract_html if 'html' in sub else _extract_text
+    
     try:
-        # Text files
-        if mime_type and 'text' in mime_type or file_ext in ['.txt', '.md', '.csv']:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-        
-        # PDF files
-        elif file_ext == '.pdf' and pdfplumber:
-            text = ""
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            return text.strip()
-        
-        # Word documents
-        elif file_ext in ['.docx', '.doc'] and docx:
-            doc = Document(file_path)
-            text = []
-            for paragraph in doc.paragraphs:
-                text.append(paragraph.text)
-            return '\n'.join(text)
-        
-        # Excel files
-        elif file_ext in ['.xlsx', '.xls'] and openpyxl:
-            workbook = load_workbook(file_path, data_only=True)
-            text = []
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                text.append(f"Sheet: {sheet_name}")
-                for row in sheet.iter_rows(values_only=True):
-                    row_text = [str(cell) if cell is not None else '' for cell in row]
-                    if any(row_text):
-                        text.append('\t'.join(row_text))
-            return '\n'.join(text)
-        
-        # PowerPoint files
-        elif file_ext in ['.pptx', '.ppt'] and Presentation:
-            prs = Presentation(file_path)
-            text = []
-            for slide_num, slide in enumerate(prs.slides, 1):
-                text.append(f"Slide {slide_num}:")
-                for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        text.append(shape.text)
-            return '\n'.join(text)
-        
-        # HTML files
-        elif file_ext in ['.html', '.htm'] or (mime_type and 'html' in mime_type):
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                soup = BeautifulSoup(f.read(), 'html.parser')
-                return soup.get_text(separator='\n', strip=True)
-        
-        # JSON files
-        elif file_ext == '.json':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return json.dumps(data, indent=2)
-        
-        # Fallback to text reading
-        else:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-                
+        return handler(file_path)
     except Exception as e:
         raise ValueError(f"Failed to extract text from {file_ext} file: {str(e)}")
 
+def _cache_ttl(cache_control: str) -> int:
+    """Seconds a response may be reused according to its Cache-Control header."""
+    directives = [d.strip() for d in cache_control.lower().split(',')]
+    if 'no-store' in directives or 'no-cache' in directives:
+        return 0
+    for directive in directives:
+        if directive.startswith('max-age='):
+            try:
+                return max(0, int(directive[len('max-age='):]))
+            except ValueError:
+                return 0
+    return 0
+
+def _read_limited(response: requests.Response, limit: int) -> io.BytesIO:
+    """Read a streamed response body into memory, refusing more than limit bytes."""
+    declared = response.headers.get('content-length')
+    if declared and declared.isdigit() and int(declared) > limit:
+        raise ValueError(f"Download is {declared} bytes, larger than the {limit} byte limit")
+    
+    buf = io.BytesIO()
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+        buf.write(chunk)
+        if buf.tell() > limit:
+            raise ValueError(f"Download exceeds the {limit} byte limit")
+    buf.seek(0)
+    return buf
+
+def _decode_body(response: requests.Response, body: bytes) -> str:
+    """Decode a downloaded body the way Response.text would."""
+    encoding = response.encoding
+    if not encoding:
+        # Response.apparent_encoding reads .content, which streaming has consumed
+        chardet = requests.compat.chardet
+        encoding = (chardet.detect(body)['encoding'] if chardet else None) or 'utf-8'
+    try:
+        return str(body, encoding, errors='replace')
+    except LookupError:
+        return str(body, 'utf-8', errors='replace')
+
+def _extract_from_response(response: requests.Response) -> str:
+    """Extract text from a streamed HTTP response based on its content type."""
+    top, sub = _split_mime(response.headers.get('content-type'))
+    # Every branch reads through the size cap; nothing buffers an unbounded body
+    body = _read_limited(response, MAX_DOWNLOAD_BYTES)
+    
+    # Handle different content types
+    if top == 'text' and sub == 'html':
+        return _html_to_text(body.getvalue())
+    elif top == 'application' and sub == 'pdf' and (_get_fitz() or _lazy('pdfplumber')):
+        # Parse the downloaded bytes in memory; no temp file write + re-read
+        return _extract_pdf_stream(body)
+    else:
+        # text/* and anything else is decoded as text
+        return _decode_body(response, body.getvalue())
+
 def download_and_extract_from_url(url: str) -> str:
     """Download and extract text from a URL."""
+    cached = _URL_CACHE.get(url)
+    if cached and cached[0] > time.time():
+        return cached[1]
+    
     try:
         # Download the content
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        content_type = response.headers.get('content-type', '').lower()
-        
-        # Handle different content types
-        if 'text/html' in content_type:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            return soup.get_text(separator='\n', strip=True)
-        elif 'text/' in content_type:
-            return response.text
-        elif 'application/pdf' in content_type and pdfplumber:
-            # Save PDF temporarily and extract
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                tmp_file.write(response.content)
-                tmp_file.flush()
-                return extract_text_from_file(tmp_file.name, 'application/pdf')
-        else:
-            # Try to extract as text
-            return response.text
-            
+        with _SESSION.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            text = _extract_from_response(response)
+            ttl = _cache_ttl(response.headers.get('cache-control', ''))
     except Exception as e:
         raise ValueError(f"Failed to download or extract text from URL: {str(e)}")
+    
+    # Only memoize responses the server allows to be reused
+    if ttl > 0 and URL_CACHE_SIZE > 0:
+        _URL_CACHE.pop(url, None)
+        while len(_URL_CACHE) >= URL_CACHE_SIZE:
+            _URL_CACHE.pop(next(iter(_URL_CACHE)))
+        _URL_CACHE[url] = (time.time() + ttl, text)
+    return text
 
-def main():
-    """Main function to run LangExtract based on provided configuration."""
-    start_time = time.time()
+def _error_output(e: BaseException) -> Dict[str, Any]:
+    """JSON-serializable error response for an exception."""
+    return {
+        'success': False,
+        'error': str(e),
+        'type': type(e).__name__,
+        'traceback': ''.join(traceback.format_exception(e))
+    }
+
+def process_config(config: Dict[str, Any], start_time: Optional[float] = None) -> Dict[str, Any]:
+    """Run LangExtract for one configuration and return the response payload."""
+    if start_time is None:
+        start_time = time.time()
     
     try:
-        # Read configuration from stdin
-        config_json = sys.stdin.read()
-        config = json.loads(config_json)
-        
         # Validate required fields
         required_fields = ['inputText', 'promptDescription', 'examples', 'modelId']
         for field in required_fields:
@@ -185,8 +460,7 @@ def main():
                             'processingTime': (time.time() - start_time) * 1000
                         }
                     }
-                    print(json.dumps(output))
-                    return
+                    return output
                     
             except Exception as e:
                 raise ValueError(f"File processing failed: {str(e)}")
@@ -201,36 +475,31 @@ def main():
                 raise ValueError(f"URL processing failed: {str(e)}")
         
         # Set API key from environment if not provided in config
-        api_key = config.get('apiKey') or os.environ.get('GEMINI_API_KEY')
+        api_key = config.get('apiKey') or _ENV_API_KEY
         if not api_key:
             raise ValueError("No API key provided. Set GEMINI_API_KEY environment variable.")
         
         # Set the API key in environment for LangExtract
         os.environ['GEMINI_API_KEY'] = api_key
         
-        # Import LangExtract after setting environment variables
-        try:
-            import langextract as lx
-        except ImportError as e:
-            raise ValueError(f"LangExtract library not available: {str(e)}")
+        if _LX_IMPORT_ERR is not None:
+            raise ValueError(f"LangExtract library not available: {str(_LX_IMPORT_ERR)}")
         
         # Prepare examples
-        examples = []
-        for example_data in config['examples']:
-            extractions = []
-            for extraction_data in example_data['extractions']:
-                extraction = lx.data.Extraction(
-                    extraction_class=extraction_data['extraction_class'],
-                    extraction_text=extraction_data['extraction_text'],
-                    attributes=extraction_data.get('attributes', {})
-                )
-                extractions.append(extraction)
-            
-            example = lx.data.ExampleData(
+        examples = [
+            lx.data.ExampleData(
                 text=example_data['text'],
-                extractions=extractions
+                extractions=[
+                    lx.data.Extraction(
+                        extraction_class=extraction_data['extraction_class'],
+                        extraction_text=extraction_data['extraction_text'],
+                        attributes=extraction_data.get('attributes', _EMPTY_ATTRIBUTES)
+                    )
+                    for extraction_data in example_data['extractions']
+                ]
             )
-            examples.append(example)
+            for example_data in config['examples']
+        ]
         
         # Run extraction with error handling
         try:
@@ -263,47 +532,152 @@ def main():
         }
         
         if hasattr(result, 'extractions') and result.extractions:
-            confidences = []
+            # Build the output and its metadata in a single ordered pass
+            extractions = output['extractions']
+            classes = set()
+            conf_sum = 0.0
+            conf_n = 0
             for extraction in result.extractions:
-                extraction_dict = {
+                confidence = getattr(extraction, 'confidence', None)
+                extractions.append({
                     'extraction_class': extraction.extraction_class,
                     'extraction_text': extraction.extraction_text,
                     'attributes': extraction.attributes,
                     'position_start': getattr(extraction, 'position_start', None),
                     'position_end': getattr(extraction, 'position_end', None),
-                    'confidence': getattr(extraction, 'confidence', None)
-                }
-                output['extractions'].append(extraction_dict)
-                
-                if extraction_dict['confidence'] is not None:
-                    confidences.append(extraction_dict['confidence'])
+                    'confidence': confidence
+                })
+                classes.add(extraction.extraction_class)
+                if confidence is not None:
+                    conf_sum += confidence
+                    conf_n += 1
             
-            # Calculate metadata
-            output['metadata']['totalExtractions'] = len(output['extractions'])
-            output['metadata']['uniqueClasses'] = len(set(e['extraction_class'] for e in output['extractions']))
-            if confidences:
-                output['metadata']['averageConfidence'] = sum(confidences) / len(confidences)
+            output['metadata']['totalExtractions'] = len(extractions)
+            output['metadata']['uniqueClasses'] = len(classes)
+            output['metadata']['averageConfidence'] = conf_sum / conf_n if conf_n else 0
         
         # Save results to temporary file for visualization
         if output['extractions']:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.jsonl', delete=False) as f:
-                json.dump({
-                    'text': input_text,
-                    'extractions': output['extractions']
-                }, f)
-                output['visualization_file'] = f.name
+            # Serialize first so a failure leaves no empty file behind
+            buf = memoryview(_dumpb({
+                'text': input_text,
+                'extractions': output['extractions']
+            }))
+            fd, visualization_path = tempfile.mkstemp(suffix='.jsonl')
+            try:
+                while buf:
+                    buf = buf[os.write(fd, buf):]
+            except BaseException:
+                os.unlink(visualization_path)
+                raise
+            finally:
+                os.close(fd)
+            output['visualization_file'] = visualization_path
         
-        print(json.dumps(output))
+        return output
         
     except Exception as e:
-        error_output = {
-            'success': False,
-            'error': str(e),
-            'type': type(e).__name__,
-            'traceback': traceback.format_exc()
-        }
-        print(json.dumps(error_output))
+        return _error_output(e)
+
+def _init_serve_worker():
+    """Pool initializer for --serve workers."""
+    global _IN_SERVE_WORKER
+    _IN_SERVE_WORKER = True
+
+def _handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Pool task for --serve mode; echoes the request id for correlation."""
+    # stdout carries the NDJSON responses, so keep stray library output off it
+    with contextlib.redirect_stdout(sys.stderr):
+        response = process_config(request)
+    response['id'] = request.get('id')
+    return response
+
+def serve():
+    """Answer NDJSON requests from stdin with NDJSON responses on stdout.
+    
+    The process stays alive between requests, so interpreter startup and the
+    langextract import are paid once; requests run on a pre-forked pool and
+    responses are written as they complete, tagged with the request's id.
+    If a worker dies, its in-flight requests are answered with errors and the
+    pool is rebuilt for the next request.
+    """
+    processes = int(os.environ.get('LX_SERVE_WORKERS', 0)) or max(1, (os.cpu_count() or 2) - 1)
+    write_lock = threading.Lock()
+    
+    def new_executor() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=processes, initializer=_init_serve_worker)
+    
+    def write_response(response: Dict[str, Any]):
+        try:
+            payload = _dumps(response)
+        except Exception as e:
+            payload = _dumps({**_error_output(e), 'id': response.get('id')})
+        with write_lock:
+            sys.stdout.write(payload + '\n')
+            sys.stdout.flush()
+    
+    def write_result(future, request_id):
+        try:
+            response = future.result()
+        except Exception as e:
+            # Includes BrokenProcessPool when the worker running it died
+            response = {**_error_output(e), 'id': request_id}
+        write_response(response)
+    
+    # Workers are forked from this thread inside submit(), never while it is
+    # blocked reading stdin.
+    executor = new_executor()
+    try:
+        for line in sys.stdin.buffer:
+            if not line.strip():
+                continue
+            try:
+                request = _loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+            except Exception as e:
+                write_response(_error_output(e))
+                continue
+            
+            try:
+                future = executor.submit(_handle_request, request)
+            except BrokenProcessPool:
+                executor.shutdown(wait=False)
+                executor = new_executor()
+                future = executor.submit(_handle_request, request)
+            future.add_done_callback(partial(write_result, request_id=request.get('id')))
+    finally:
+        # stdin closed: finish outstanding requests before exiting
+        executor.shutdown(wait=True)
+
+def main():
+    """Main function to run LangExtract based on provided configuration."""
+    start_time = time.time()
+    
+    try:
+        # Parse the raw stdin bytes directly; no intermediate decoded str copy
+        config = _loads(sys.stdin.buffer.read())
+    except Exception as e:
+        output = _error_output(e)
+    else:
+        output = process_config(config, start_time)
+    
+    try:
+        payload = _dumps(output)
+    except Exception as e:
+        output = _error_output(e)
+        payload = _dumps(output)
+    
+    sys.stdout.write(payload)
+    if not output['success']:
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--serve", action="store_true", help="Handle NDJSON requests on stdin until EOF")
+    args = parser.parse_args()
+    
+    if args.serve:
+        serve()
+    else:
+        main()
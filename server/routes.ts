@@ -8,14 +8,15 @@ import multer from "multer";
 import fs from "fs/promises";
 import fetch from "node-fetch";
 import mammoth from "mammoth";
-import { spawn } from "child_process";
 import FirecrawlApp from "@mendable/firecrawl-js";
 import path from "path";
 import os from "os";
 import type { ExtractionResult } from "@shared/schema";
 import { GeminiExampleService } from "./services/gemini";
+import { ExtractionWorker } from "./services/extraction-worker";
 
 const langExtractService = new LangExtractService();
+const extractionWorker = new ExtractionWorker();
 let geminiExampleService: GeminiExampleService | null = null;
 
 // Initialize Gemini service if API key is available
@@ -503,53 +504,21 @@ async function generatePDFContent(job: any, extractions: ExtractionResult[], met
   }
 }
 
-// Helper function to extract text from files using Python script
+// Helper function to extract text from files using the long-lived Python worker
 async function extractTextFromFile(filePath: string, mimeType?: string): Promise<string> {
-  return new Promise((resolve, reject) => {
-    const pythonProcess = spawn('python3', ['scripts/enhanced_langextract_runner.py'], {
-      stdio: ['pipe', 'pipe', 'pipe']
-    });
-
-    const config = {
-      inputText: "",
-      filePath: filePath,
-      promptDescription: "Extract text content",
-      examples: [],
-      modelId: "gemini-2.5-flash"
-    };
-
-    pythonProcess.stdin.write(JSON.stringify(config));
-    pythonProcess.stdin.end();
-
-    let output = '';
-    let errorOutput = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      output += data.toString();
-    });
-
-    pythonProcess.stderr.on('data', (data) => {
-      errorOutput += data.toString();
-    });
-
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        reject(new Error(`Text extraction failed: ${errorOutput}`));
-        return;
-      }
-
-      try {
-        const result = JSON.parse(output);
-        if (result.success && result.extractedText) {
-          resolve(result.extractedText);
-        } else {
-          reject(new Error(result.error || 'Failed to extract text'));
-        }
-      } catch (e) {
-        reject(new Error(`Failed to parse extraction result: ${output}`));
-      }
-    });
-  });
+  const config = {
+    inputText: "",
+    filePath: filePath,
+    promptDescription: "Extract text content",
+    examples: [],
+    modelId: "gemini-2.5-flash"
+  };
+
+  const result = await extractionWorker.run(config);
+  if (result.success && result.extractedText) {
+    return result.extractedText;
+  }
+  throw new Error(result.error || 'Failed to extract text');
 }
 
 // Configure multer for file uploads
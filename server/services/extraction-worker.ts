@@ -0,0 +1,152 @@
+import { spawn, type ChildProcessWithoutNullStreams } from "child_process";
+import path from "path";
+
+interface PendingRequest {
+  line: string;
+  resolve: (response: any) => void;
+  reject: (error: Error) => void;
+  timer: NodeJS.Timeout;
+}
+
+interface WorkerProcess {
+  child: ChildProcessWithoutNullStreams;
+  pending: Map<number, PendingRequest>;
+  buffer: string;
+}
+
+// Long-lived `enhanced_langextract_runner.py --serve` process. Requests are
+// written to its stdin as NDJSON and matched to responses by id, so Python
+// startup and imports are paid once instead of on every request.
+export class ExtractionWorker {
+  private pythonPath: string;
+  private scriptPath: string;
+  private timeoutMs: number;
+  private worker: WorkerProcess | null = null;
+  private nextId = 1;
+
+  constructor() {
+    this.pythonPath = process.env.PYTHON_PATH || 'python3';
+    this.scriptPath = path.join(process.cwd(), 'scripts', 'enhanced_langextract_runner.py');
+    this.timeoutMs = Number(process.env.EXTRACTION_TIMEOUT_MS) || 120000;
+  }
+
+  run(config: Record<string, unknown>): Promise<any> {
+    const id = this.nextId++;
+    const line = JSON.stringify({ ...config, id }) + '\n';
+
+    return new Promise((resolve, reject) => {
+      this.dispatch(id, { line, resolve, reject });
+    });
+  }
+
+  private dispatch(id: number, request: Omit<PendingRequest, 'timer'>) {
+    const worker = this.ensureProcess();
+    const timer = setTimeout(() => this.timeOut(worker, id), this.timeoutMs);
+    worker.pending.set(id, { ...request, timer });
+    worker.child.stdin.write(request.line);
+  }
+
+  private timeOut(worker: WorkerProcess, id: number) {
+    const request = worker.pending.get(id);
+    if (!request) {
+      return;
+    }
+    worker.pending.delete(id);
+    request.reject(new Error(`Text extraction timed out after ${this.timeoutMs}ms`));
+
+    // Killing the worker is the only way to stop the stuck task; the other
+    // requests it was running are retried on a fresh one
+    const others = Array.from(worker.pending);
+    worker.pending.clear();
+    this.killWorker(worker);
+    others.forEach(([otherId, other]) => {
+      clearTimeout(other.timer);
+      this.dispatch(otherId, other);
+    });
+  }
+
+  private ensureProcess(): WorkerProcess {
+    if (this.worker) {
+      return this.worker;
+    }
+
+    // Own process group, so killWorker() also reaches the pool's children
+    const child = spawn(this.pythonPath, [this.scriptPath, '--serve'], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+      detached: true
+    });
+    const worker: WorkerProcess = { child, pending: new Map(), buffer: '' };
+    child.stdout.setEncoding('utf8');
+    child.stderr.setEncoding('utf8');
+
+    child.stdout.on('data', (data: string) => {
+      this.handleOutput(worker, data);
+    });
+
+    child.stderr.on('data', (data: string) => {
+      console.warn(`Extraction worker: ${data}`);
+    });
+
+    // Write errors surface through 'close'; don't let EPIPE crash the server
+    child.stdin.on('error', () => {});
+
+    child.on('error', (error) => {
+      this.failPending(worker, error);
+    });
+
+    child.on('close', (code) => {
+      this.failPending(worker, new Error(`Extraction worker exited with code ${code}`));
+    });
+
+    this.worker = worker;
+    return worker;
+  }
+
+  private handleOutput(worker: WorkerProcess, data: string) {
+    worker.buffer += data;
+
+    let newline: number;
+    while ((newline = worker.buffer.indexOf('\n')) !== -1) {
+      const line = worker.buffer.slice(0, newline);
+      worker.buffer = worker.buffer.slice(newline + 1);
+      if (!line.trim()) {
+        continue;
+      }
+
+      try {
+        const response = JSON.parse(line);
+        const request = worker.pending.get(response.id);
+        if (request) {
+          worker.pending.delete(response.id);
+          clearTimeout(request.timer);
+          request.resolve(response);
+        }
+      } catch (e) {
+        console.warn(`Unexpected extraction worker output: ${line}`);
+      }
+    }
+  }
+
+  private killWorker(worker: WorkerProcess) {
+    if (this.worker === worker) {
+      this.worker = null;
+    }
+    try {
+      process.kill(-worker.child.pid!, 'SIGKILL');
+    } catch (e) {
+      worker.child.kill('SIGKILL');
+    }
+  }
+
+  private failPending(worker: WorkerProcess, error: Error) {
+    // Only this worker's requests are affected; the next request spawns a fresh one
+    if (this.worker === worker) {
+      this.worker = null;
+    }
+    worker.pending.forEach((request) => {
+      clearTimeout(request.timer);
+      request.reject(error);
+    });
+    worker.pending.clear();
+  }
+}
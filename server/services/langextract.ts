@@ -60,10 +60,19 @@ import os
 from typing import Dict, List, Any
 import argparse
 
+try:
+    import orjson
+    def _dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
 try:
     import langextract as lx
 except ImportError:
-    print(json.dumps({"error": "langextract not installed. Please install with: pip install langextract"}))
+    print(_dumps({"error": "langextract not installed. Please install with: pip install langextract"}))
     sys.exit(1)
 
 def run_extraction(config: Dict[str, Any]) -> Dict[str, Any]:
@@ -143,14 +152,14 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     try:
-        with open(args.config, 'r') as f:
-            config = json.load(f)
+        with open(args.config, 'rb') as f:
+            config = _loads(f.read())
         
         result = run_extraction(config)
-        print(json.dumps(result))
+        sys.stdout.write(_dumps(result))
         
     except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        sys.stdout.write(_dumps({"success": False, "error": str(e)}))
 `;
 
     await fs.writeFile(this.scriptPath, pythonScript);
@@ -224,13 +233,16 @@ if __name__ == "__main__":
       
       let stdout = '';
       let stderr = '';
+      // Decode across chunk boundaries; orjson output is raw UTF-8, not \u-escaped
+      process.stdout.setEncoding('utf8');
+      process.stderr.setEncoding('utf8');
 
-      process.stdout.on('data', (data) => {
-        stdout += data.toString();
+      process.stdout.on('data', (data: string) => {
+        stdout += data;
       });
 
-      process.stderr.on('data', (data) => {
-        stderr += data.toString();
+      process.stderr.on('data', (data: string) => {
+        stderr += data;
       });
 
       process.on('close', (code) => {